@@ -163,6 +163,12 @@ def rewrite_sqlite_registry(**kwargs: Any) -> None:
 
     On completion a new registry will be written in its place and the
     old registry moved to a backup file.
+
+    The new registry is built in a temporary folder inside the repository.
+    If the DAF_BUTLER_MIGRATE_SCRATCH environment variable is set, the
+    temporary folder and the file with exported registry contents are
+    created in that location instead (e.g. on a local disk when the
+    repository is on a slow network file system).
     """
     script.rewrite_sqlite_registry(**kwargs)
 
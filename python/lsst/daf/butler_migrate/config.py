@@ -83,15 +83,11 @@ class MigAlembicConfig(Config):
 
         migrate_trees = migrate.MigrationTrees(mig_path)
         if single_tree:
-            if "/" in single_tree:
-                # means one-shot tree
-                version_locations = [migrate_trees.one_shot_version_location(single_tree, relative=False)]
-            else:
-                version_locations = [migrate_trees.regular_version_location(single_tree, relative=False)]
+            cfg.set_single_tree(single_tree, migrate_trees)
         else:
             version_locations = migrate_trees.version_locations(one_shot_tree, relative=False)
-        _LOG.debug("version_locations: %r", version_locations)
-        cfg.set_main_option("version_locations", " ".join(version_locations))
+            _LOG.debug("version_locations: %r", version_locations)
+            cfg.set_main_option("version_locations", " ".join(version_locations))
 
         # we do not use this option, this is just to make sure that
         # [daf_butler_migrate] section exists
@@ -116,6 +112,28 @@ class MigAlembicConfig(Config):
 
         return cfg
 
+    def set_single_tree(self, single_tree: str, migrate_trees: migrate.MigrationTrees) -> None:
+        """Re-configure Alembic to use a single version tree only.
+
+        This allows re-using the same configuration object for multiple
+        trees instead of making a new one for each tree.
+
+        Parameters
+        ----------
+        single_tree : `str`
+            Name of the version tree. If it contains slash character then it
+            is assumed to be one-shot tree.
+        migrate_trees : `migrate.MigrationTrees`
+            Object describing structure of the migration trees.
+        """
+        if "/" in single_tree:
+            # means one-shot tree
+            version_location = migrate_trees.one_shot_version_location(single_tree, relative=False)
+        else:
+            version_location = migrate_trees.regular_version_location(single_tree, relative=False)
+        _LOG.debug("version_locations: %r", [version_location])
+        self.set_main_option("version_locations", version_location)
+
     def get_template_directory(self) -> str:
         """Return the directory where Alembic setup templates are found.
 
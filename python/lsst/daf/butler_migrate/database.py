@@ -68,6 +68,22 @@ class Database:
     def __init__(self, db_url: sqlalchemy.engine.url.URL, schema: str | None = None):
         self._db_url = db_url
         self._schema = schema
+        # Engine (and its connection pool) is shared by all methods.
+        self._engine = sqlalchemy.engine.create_engine(db_url)
+
+    def __enter__(self) -> Database:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close all pooled database connections.
+
+        The instance can still be used after this call, new connections are
+        opened when needed.
+        """
+        self._engine.dispose()
 
     @classmethod
     def from_repo(cls, repo: str) -> Database:
@@ -102,8 +118,7 @@ class Database:
     @contextmanager
     def connect(self) -> Iterator[sqlalchemy.engine.Connection]:
         """Context manager for database connection."""
-        engine = sqlalchemy.engine.create_engine(self._db_url)
-        with engine.connect() as connection:
+        with self._engine.connect() as connection:
             yield connection
 
     def dimensions_namespace(self) -> str | None:
@@ -114,8 +129,6 @@ class Database:
         namespace: `str` or `None`
             Dimensions namespace or `None` if not defined.
         """
-        engine = sqlalchemy.engine.create_engine(self._db_url)
-
         meta = sqlalchemy.schema.MetaData(schema=self._schema)
         table = sqlalchemy.schema.Table(
             "butler_attributes",
@@ -125,7 +138,7 @@ class Database:
         )
 
         sql = sqlalchemy.sql.select(table.columns.value).where(table.columns.name == self.dimensions_json_key)
-        with engine.connect() as connection:
+        with self._engine.connect() as connection:
             result = connection.execute(sql)
             row = result.fetchone()
             if row is None:
@@ -149,8 +162,6 @@ class Database:
             tuple consisting of manager class name (including package/module),
             version string in X.Y.Z format, and revision ID string/hash.
         """
-        engine = sqlalchemy.engine.create_engine(self._db_url)
-
         meta = sqlalchemy.schema.MetaData(schema=self._schema)
         table = sqlalchemy.schema.Table(
             "butler_attributes",
@@ -162,8 +173,15 @@ class Database:
         # parse table contents into two separate maps
         managers: dict[str, str] = {}
         versions: dict[str, str] = {}
-        sql = sqlalchemy.sql.select(table.columns.name, table.columns.value)
-        with engine.connect() as connection:
+        # Only read the attributes that are parsed below.
+        sql = sqlalchemy.sql.select(table.columns.name, table.columns.value).where(
+            sqlalchemy.sql.or_(
+                table.columns.name.startswith("config:registry.managers.", autoescape=True),
+                table.columns.name.startswith("version:", autoescape=True),
+                table.columns.name.in_([self.dimensions_json_key, self.obscore_json_key]),
+            )
+        )
+        with self._engine.connect() as connection:
             result = connection.execute(sql)
             for name, value in result:
                 if name.startswith("config:registry.managers."):
@@ -210,15 +228,17 @@ class Database:
             Returned list is empty if alembic version table does not exist or
             is empty.
         """
-        engine = sqlalchemy.engine.create_engine(self._db_url)
-        with engine.connect() as connection:
+        with self._engine.connect() as connection:
             ctx = MigrationContext.configure(
                 connection=connection, opts={"version_table_schema": self._schema}
             )
             return list(ctx.get_current_heads())
 
     def validate_revisions(
-        self, namespace: str | None = None, base_revisions: Iterable[str] | None = None
+        self,
+        namespace: str | None = None,
+        base_revisions: Iterable[str] | None = None,
+        alembic_revisions: Iterable[str] | None = None,
     ) -> None:
         """Verify consistency of alembic revisions and butler versions.
 
@@ -233,6 +253,10 @@ class Database:
             ``config:dimensions.json``.
         base_revisions : `iterable` [`str`], optional
             Optional base revisions of the migration trees.
+        alembic_revisions : `iterable` [`str`], optional
+            Current revisions from alembic version table, if already known to
+            the caller (e.g. from `alembic_revisions`). If `None` then they
+            are retrieved from database.
 
         Raises
         ------
@@ -245,7 +269,10 @@ class Database:
             manager_versions = self.manager_versions(namespace)
         except sqlalchemy.exc.OperationalError:
             raise RevisionConsistencyError("butler_attributes table does not exist")
-        alembic_revisions = self.alembic_revisions()
+        if alembic_revisions is None:
+            alembic_revisions = self.alembic_revisions()
+        else:
+            alembic_revisions = list(alembic_revisions)
 
         if manager_versions and not alembic_revisions:
             raise RevisionConsistencyError("alembic_version table does not exist or is empty")
@@ -285,8 +312,7 @@ class Database:
             List of the tables, if missing or empty then schema for all tables
             is printed.
         """
-        engine = sqlalchemy.engine.create_engine(self._db_url)
-        inspector = sqlalchemy.inspect(engine)
+        inspector = sqlalchemy.inspect(self._engine)
         table_names = sorted(inspector.get_table_names(schema=self._schema))
         for table in table_names:
             if tables and table not in tables:
@@ -154,12 +154,10 @@ class MigrationTrees:
             is the location of a folder with migration scripts.
         """
         locations: dict[str, str] = {}
-        for entry in os.scandir(self.mig_path):
-            if entry.is_dir() and entry.name not in ("_alembic", "_oneshot"):
-                path = entry.name
-                if not relative:
-                    path = os.path.join(self.mig_path, path)
-                locations[entry.name] = path
+        with os.scandir(self.mig_path) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.name not in ("_alembic", "_oneshot"):
+                    locations[entry.name] = entry.name if relative else entry.path
         return locations
 
     def one_shot_locations(self, manager: str | None = None, *, relative: bool = True) -> dict[str, str]:
@@ -182,26 +180,30 @@ class MigrationTrees:
         locations: dict[str, str] = {}
 
         one_shot_loc = os.path.join(self.mig_path, "_oneshot")
-        if not os.access(one_shot_loc, os.F_OK):
-            return locations
 
         if manager:
             managers = [manager]
         else:
-            managers = [entry.name for entry in os.scandir(one_shot_loc) if entry.is_dir()]
+            try:
+                with os.scandir(one_shot_loc) as entries:
+                    managers = [entry.name for entry in entries if entry.is_dir()]
+            except FileNotFoundError:
+                return locations
 
         for manager in managers:
             rel_path = os.path.join("_oneshot", manager)
             manager_path = os.path.join(self.mig_path, rel_path)
             # it may not exist, treat it as empty
-            if not os.access(manager_path, os.F_OK):
+            try:
+                with os.scandir(manager_path) as entries:
+                    tree_names = [entry.name for entry in entries if entry.is_dir()]
+            except FileNotFoundError:
                 continue
-            for entry in os.scandir(manager_path):
-                if entry.is_dir():
-                    path = os.path.join(rel_path, entry.name)
-                    if not relative:
-                        path = os.path.join(self.mig_path, path)
-                    locations[manager + "/" + entry.name] = path
+            for tree_name in tree_names:
+                path = os.path.join(rel_path, tree_name)
+                if not relative:
+                    path = os.path.join(self.mig_path, path)
+                locations[manager + "/" + tree_name] = path
         return locations
 
     def version_locations(self, one_shot_tree: str | None = None, *, relative: bool = True) -> list[str]:
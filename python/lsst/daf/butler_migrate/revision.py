@@ -21,6 +21,7 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 import uuid
 
@@ -32,6 +33,7 @@ produced by `uuid.uuid5(uuid.NAMESPACE_DNS, "lsst.org")`.
 """
 
 
+@functools.lru_cache(maxsize=1024)
 def rev_id(*args: str) -> str:
     """Generate revision ID from arguments.
 
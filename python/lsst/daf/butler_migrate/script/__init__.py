@@ -19,15 +19,69 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from .migrate_add_tree import migrate_add_tree
-from .migrate_current import migrate_current
-from .migrate_downgrade import migrate_downgrade
-from .migrate_dump_schema import migrate_dump_schema
-from .migrate_history import migrate_history
-from .migrate_revision import migrate_revision
-from .migrate_set_namespace import migrate_set_namespace
-from .migrate_stamp import migrate_stamp
-from .migrate_trees import migrate_trees
-from .migrate_upgrade import migrate_upgrade
-from .rewrite_sqlite_registry import rewrite_sqlite_registry
-from .update_day_obs import update_day_obs
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from typing import TYPE_CHECKING, Any
+
+__all__ = [
+    "migrate_add_tree",
+    "migrate_current",
+    "migrate_downgrade",
+    "migrate_dump_schema",
+    "migrate_history",
+    "migrate_revision",
+    "migrate_set_namespace",
+    "migrate_stamp",
+    "migrate_trees",
+    "migrate_upgrade",
+    "rewrite_sqlite_registry",
+    "update_day_obs",
+]
+
+if TYPE_CHECKING:
+    from .migrate_add_tree import migrate_add_tree
+    from .migrate_current import migrate_current
+    from .migrate_downgrade import migrate_downgrade
+    from .migrate_dump_schema import migrate_dump_schema
+    from .migrate_history import migrate_history
+    from .migrate_revision import migrate_revision
+    from .migrate_set_namespace import migrate_set_namespace
+    from .migrate_stamp import migrate_stamp
+    from .migrate_trees import migrate_trees
+    from .migrate_upgrade import migrate_upgrade
+    from .rewrite_sqlite_registry import rewrite_sqlite_registry
+    from .update_day_obs import update_day_obs
+
+
+class _ScriptModule(types.ModuleType):
+    """Module type which keeps command functions as package attributes.
+
+    Each sub-module defines a function with the same name as the sub-module.
+    When a sub-module is imported, the import system sets package attribute
+    to the sub-module object, this class replaces it with the function.
+    """
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in __all__ and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+def __getattr__(name: str) -> Any:
+    # Sub-modules are imported on first access, so that running one command
+    # does not import dependencies (alembic, sqlalchemy, butler) of all the
+    # other commands.
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    importlib.import_module(f".{name}", __name__)
+    return globals()[name]
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+sys.modules[__name__].__class__ = _ScriptModule
@@ -80,14 +80,14 @@ def migrate_add_tree(tree_name: str, mig_path: str, one_shot: bool) -> None:
         tree_folder = trees.one_shot_version_location(tree_name, relative=False)
     else:
         tree_folder = trees.regular_version_location(tree_name, relative=False)
-    if os.access(tree_folder, os.F_OK):
+    if os.path.lexists(tree_folder):
         raise ValueError(f"Version tree {tree_name!r} already exists in {tree_folder}")
 
     cfg = config.MigAlembicConfig.from_mig_path(mig_path, single_tree=tree_name)
 
     # may need to initialize the whole shebang
     alembic_folder = trees.alembic_folder(relative=False)
-    if not os.access(alembic_folder, os.F_OK):
+    if not os.path.lexists(alembic_folder):
         _LOG.debug("Creating new alembic folder %r", alembic_folder)
 
         # initialize tree folder
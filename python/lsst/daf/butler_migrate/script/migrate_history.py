@@ -57,21 +57,25 @@ def migrate_history(tree_name: str, mig_path: str, verbose: bool, one_shot: bool
 
 
 def _one_shot_migrate_history(tree_name: str, mig_path: str, verbose: bool) -> None:
+    migrate_trees = migrate.MigrationTrees(mig_path)
     if tree_name:
         if "/" in tree_name:
             # Full tree name specified.
             single_trees = [tree_name]
         else:
             # This is a maanger name, get all one-shot trees for this manager.
-            migrate_trees = migrate.MigrationTrees(mig_path)
             locations = migrate_trees.one_shot_locations(tree_name, relative=False)
             single_trees = list(locations)
     else:
         # Get all trees for all managers.
-        migrate_trees = migrate.MigrationTrees(mig_path)
         locations = migrate_trees.one_shot_locations(relative=False)
         single_trees = list(locations)
 
+    # Make one configuration and only switch its version location per tree.
+    cfg: config.MigAlembicConfig | None = None
     for tree_name in single_trees:
-        cfg = config.MigAlembicConfig.from_mig_path(mig_path, single_tree=tree_name)
+        if cfg is None:
+            cfg = config.MigAlembicConfig.from_mig_path(mig_path, single_tree=tree_name)
+        else:
+            cfg.set_single_tree(tree_name, migrate_trees)
         command.history(cfg, verbose=verbose)
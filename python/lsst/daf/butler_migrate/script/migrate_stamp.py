@@ -55,42 +55,46 @@ def migrate_stamp(
     manager : `str`, Optional
         Name of the manager to stamp, if `None` then all managers are stamped.
     """
-    db = database.Database.from_repo(repo)
+    with database.Database.from_repo(repo) as db:
 
-    if namespace is None and db.dimensions_namespace() is None:
-        raise ValueError(
-            "The `--namespace` option is required when namespace is missing from"
-            " stored dimensions configuration"
-        )
+        if namespace is None and db.dimensions_namespace() is None:
+            raise ValueError(
+                "The `--namespace` option is required when namespace is missing from"
+                " stored dimensions configuration"
+            )
 
-    manager_versions = db.manager_versions(namespace)
+        manager_versions = db.manager_versions(namespace)
 
-    revisions: dict[str, str] = {}
-    for mgr_name, (klass, version, rev_id) in manager_versions.items():
-        _LOG.debug("found revision (%s, %s, %s) -> %s", mgr_name, klass, version, rev_id)
-        revisions[mgr_name] = rev_id
+        revisions = {mgr_name: rev_id for mgr_name, (_, _, rev_id) in manager_versions.items()}
+        if _LOG.isEnabledFor(logging.DEBUG):
+            for mgr_name, (klass, version, rev_id) in manager_versions.items():
+                _LOG.debug("found revision (%s, %s, %s) -> %s", mgr_name, klass, version, rev_id)
 
-    cfg: config.MigAlembicConfig | None = None
-    if manager:
-        if manager in revisions:
-            revisions = {manager: revisions[manager]}
-        else:
-            # If specified manager not in the database, it may mean that an
-            # initial "tree-root" revision needs to be added to alembic
-            # table, if that manager is defined in the migration trees.
-            cfg = config.MigAlembicConfig.from_mig_path(mig_path, repository=repo, db=db)
-            script_info = scripts.Scripts(cfg)
-            base_revision = revision.rev_id(manager)
-            if base_revision not in script_info.base_revisions():
-                raise ValueError(f"Unknown manager name {manager} (not in the database or migrations)")
-            revisions = {manager: base_revision}
+        cfg: config.MigAlembicConfig | None = None
+        if manager:
+            if manager in revisions:
+                revisions = {manager: revisions[manager]}
+            else:
+                # If specified manager not in the database, it may mean that an
+                # initial "tree-root" revision needs to be added to alembic
+                # table, if that manager is defined in the migration trees.
+                cfg = config.MigAlembicConfig.from_mig_path(mig_path, repository=repo, db=db)
+                script_info = scripts.Scripts(cfg)
+                base_revision = revision.rev_id(manager)
+                if base_revision not in script_info.base_revisions():
+                    raise ValueError(f"Unknown manager name {manager} (not in the database or migrations)")
+                revisions = {manager: base_revision}
 
-    if dry_run:
-        print("Will store these revisions in alembic version table:")
-        for manager, rev_id in revisions.items():
-            print(f"  {manager}: {rev_id}")
-    else:
-        if cfg is None:
-            cfg = config.MigAlembicConfig.from_mig_path(mig_path, repository=repo, db=db)
-        for rev in revisions.values():
-            command.stamp(cfg, rev, purge=purge)
+        if dry_run:
+            lines = ["Will store these revisions in alembic version table:"]
+            lines += [f"  {manager}: {rev_id}" for manager, rev_id in revisions.items()]
+            print("\n".join(lines))
+        elif revisions:
+            # Empty list of revisions means "base" to alembic, which would
+            # delete all existing records from the version table, so there is
+            # nothing to do without revisions.
+            if cfg is None:
+                cfg = config.MigAlembicConfig.from_mig_path(mig_path, repository=repo, db=db)
+            # Stamp all revisions in one call, this runs migration environment
+            # and a transaction only once, and purges the table only once.
+            command.stamp(cfg, list(revisions.values()), purge=purge)
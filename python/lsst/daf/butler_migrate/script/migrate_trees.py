@@ -57,13 +57,11 @@ def migrate_trees(mig_path: str, verbose: bool, one_shot: bool) -> None:
         branches = revision.branch_labels
         if not branches:
             branch = name
-        elif len(branches) == 1:
-            branch = branches.pop()
         else:
             # Multiple branch labels, usually means that there is one
             # branch and "manager-ClassName" branch label "leaked" to the
             # root. Just use shortest name, that should be sufficient.
-            _, branch = min((len(label), label) for label in branches)
+            branch = min(branches, key=lambda label: (len(label), label))
         bases_map[branch] = revision
 
     for branch, revision in sorted(bases_map.items()):
@@ -81,16 +79,23 @@ def _migrate_trees_one_shot(mig_path: str, verbose: bool) -> None:
     one_shot_locations = migrate_trees.one_shot_locations()
     tree_names = sorted(one_shot_locations.keys())
 
-    for entry in sorted(tree_names):
-        cfg = config.MigAlembicConfig.from_mig_path(mig_path, single_tree=entry)
-        scripts = ScriptDirectory.from_config(cfg)
+    # Make one configuration and only switch its version location per tree.
+    cfg: config.MigAlembicConfig | None = None
+    for entry in tree_names:
+        if not verbose:
+            # Names are all we need, no reason to load the scripts.
+            print(entry)
+            continue
 
-        if verbose:
-            bases = scripts.get_bases()
-            if bases:
-                assert len(bases) == 1
-                revision = scripts.get_revision(bases[0])
-                assert revision is not None, "Script for a known base must exist"
-                print(revision.log_entry)
+        if cfg is None:
+            cfg = config.MigAlembicConfig.from_mig_path(mig_path, single_tree=entry)
         else:
-            print(entry)
+            cfg.set_single_tree(entry, migrate_trees)
+        scripts = ScriptDirectory.from_config(cfg)
+
+        bases = scripts.get_bases()
+        if bases:
+            assert len(bases) == 1
+            revision = scripts.get_revision(bases[0])
+            assert revision is not None, "Script for a known base must exist"
+            print(revision.log_entry)
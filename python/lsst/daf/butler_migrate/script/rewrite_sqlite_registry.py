@@ -21,20 +21,25 @@
 
 __all__ = ("rewrite_sqlite_registry",)
 
-import io
+import errno
 import logging
 import os
+import shutil
+import sqlite3
 import tempfile
 from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
 
+import sqlalchemy
 from lsst.daf.butler import (
     Butler,
     CollectionType,
     Config,
-    DatasetAssociation,
     DatasetId,
     DatasetRef,
     SkyPixDimension,
+    Timespan,
 )
 from lsst.daf.butler.datastores.fileDatastore import FileDatastore
 from lsst.daf.butler.direct_butler import DirectButler
@@ -43,9 +48,26 @@ from lsst.daf.butler.registry.sql_registry import SqlRegistry
 from lsst.daf.butler.transfers import RepoExportContext
 from lsst.resources import ResourcePath
 from lsst.utils.introspection import get_class_of
+from lsst.utils.iteration import chunk_iterable
 
 log = logging.getLogger(__name__)
 
+_SCRATCH_DIR_ENV = "DAF_BUTLER_MIGRATE_SCRATCH"
+"""Name of envvar for a folder where temporary registry is created, default
+is to create it inside the repository.
+"""
+
+_BULK_LOAD_PRAGMAS = (
+    "PRAGMA journal_mode = MEMORY",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+    "PRAGMA mmap_size = 1073741824",
+)
+"""Pragmas used for the destination database while it is being filled,
+negative cache size is in KiB, mmap size is in bytes.
+"""
+
 
 def rewrite_sqlite_registry(source: str) -> None:
     """Rewrite a SQLite registry as a new registry.
@@ -61,6 +83,15 @@ def rewrite_sqlite_registry(source: str) -> None:
     ----------
     source : `str`
         URI to a SQLite butler repository.
+
+    Notes
+    -----
+    The new registry is written to a temporary folder inside the repository,
+    if ``DAF_BUTLER_MIGRATE_SCRATCH`` environment variable is set then the
+    folder is created in that location instead (e.g. on a local disk when the
+    repository is on a slow network file system). The same location is used
+    for a temporary file with exported registry contents, by default that file
+    is created in the system temporary folder.
     """
     # Create the source butler early so we can ask it questions
     # without assuming things.
@@ -81,8 +112,8 @@ def rewrite_sqlite_registry(source: str) -> None:
     source_config = Config(source_config_uri)
 
     # Keep the source_config around since we will need to rewrite it
-    # later. Work on a copy.
-    config = Config(source_config_uri)
+    # later. Work on a (deep) copy.
+    config = source_config.copy()
 
     # Assume that we are rewriting this with the current set of registry
     # managers so remove any.
@@ -116,8 +147,8 @@ def rewrite_sqlite_registry(source: str) -> None:
         )
 
     # Create a temp directory for the temporary butler (put it inside
-    # the existing repositor).
-    root_dir = source_config_uri.dirname().ospath
+    # the existing repository, unless scratch location is specified).
+    root_dir = os.environ.get(_SCRATCH_DIR_ENV) or source_config_uri.dirname().ospath
     with tempfile.TemporaryDirectory(prefix="temp-butler-", dir=root_dir) as dest_dir:
         # Create a new butler with this config as the seed but ensuring that it
         # does not overwrite the datastore root.
@@ -134,7 +165,11 @@ def rewrite_sqlite_registry(source: str) -> None:
         assert isinstance(dest_butler._registry, SqlRegistry), "Expecting SqlRegistry instance"
         assert isinstance(dest_butler._registry._db, SqliteDatabase), "Expecting SqliteDatabase instance"
 
-        transfer_everything(source_butler, dest_butler)
+        with _bulk_load_pragmas(dest_butler._registry._db):
+            transfer_everything(source_butler, dest_butler)
+            # VACUUM rewrites the whole file, run it with relaxed durability
+            # too.
+            _vacuum_and_analyze(dest_butler._registry._db)
 
         # Obtain the name of the sqlite file at the destination.
         assert dest_butler._registry._db.filename is not None, "Expecting non-None filename from registry"
@@ -147,15 +182,19 @@ def rewrite_sqlite_registry(source: str) -> None:
         # Now need to move this registry to the original location
         # and move the existing registry to a backup.
 
-        # Relocate the source registry first
+        # Stage the new registry next to the original first, so that a failed
+        # copy from a scratch file system leaves the original in place.
         assert source_butler._registry._db.filename is not None, "Expecting non-None filename from registry"
         source_registry_uri = ResourcePath(source_butler._registry._db.filename)
+        staged_registry = _stage_file(dest_registry_uri.ospath, source_registry_uri.ospath)
+
+        # Relocate the source registry to a backup.
         new_basename = "original_" + source_registry_uri.basename()
         backup_registry_uri = source_registry_uri.updatedFile(new_basename)
         os.rename(source_registry_uri.ospath, backup_registry_uri.ospath)
 
         # Move the new registry into the old location.
-        os.rename(dest_registry_uri.ospath, source_registry_uri.ospath)
+        os.replace(staged_registry, source_registry_uri.ospath)
 
         # Rename the butler yaml file.
         backup_config_uri = source_config_uri.updatedFile("original_butler.yaml")
@@ -170,6 +209,99 @@ def rewrite_sqlite_registry(source: str) -> None:
     print(f"Successfully rewrote registry for butler at {source_config_uri}")
 
 
+@contextmanager
+def _bulk_load_pragmas(db: SqliteDatabase) -> Iterator[None]:
+    """Relax durability of a scratch SQLite database while it is filled.
+
+    Parameters
+    ----------
+    db : `~lsst.daf.butler.registry.databases.sqlite.SqliteDatabase`
+        Destination database, it is not visible to anybody else until the
+        rewrite finishes, so losing it on a crash is harmless.
+
+    Notes
+    -----
+    Keeps the rollback journal in memory with ``synchronous=OFF`` so that
+    commits do not fsync, keeps temporary tables and a larger page cache in
+    memory, and reads pages through memory mapping. WAL mode is not used
+    because the database is often created on a network file system where
+    its shared-memory file does not work.
+    None of these settings persist in the database file, on exit the pooled
+    connections are dropped so that new connections use defaults.
+    """
+    engine = db._engine
+
+    def _on_connect(dbapi_connection: sqlite3.Connection, connection_record: object) -> None:
+        with closing(dbapi_connection.cursor()) as cursor:
+            for pragma in _BULK_LOAD_PRAGMAS:
+                cursor.execute(pragma)
+
+    sqlalchemy.event.listen(engine, "connect", _on_connect)
+    # Pooled connections were opened without the listener.
+    engine.dispose()
+    try:
+        yield
+    finally:
+        sqlalchemy.event.remove(engine, "connect", _on_connect)
+        engine.dispose()
+
+
+def _vacuum_and_analyze(db: SqliteDatabase) -> None:
+    """Compact a freshly filled SQLite database and collect statistics for
+    the query planner.
+
+    Parameters
+    ----------
+    db : `~lsst.daf.butler.registry.databases.sqlite.SqliteDatabase`
+        Database to optimize.
+    """
+    engine = db._engine
+    # VACUUM cannot run inside a transaction, use raw connection which is in
+    # autocommit mode.
+    connection = engine.raw_connection()
+    try:
+        with closing(connection.cursor()) as cursor:
+            cursor.execute("VACUUM")
+            cursor.execute("ANALYZE")
+    finally:
+        connection.close()
+    engine.dispose()
+
+
+def _stage_file(source: str, destination: str) -> str:
+    """Move a file next to its final location, possibly from a different file
+    system.
+
+    Parameters
+    ----------
+    source : `str`
+        Path to the file to move.
+    destination : `str`
+        Final path of the file, it is not modified.
+
+    Returns
+    -------
+    staged : `str`
+        Path of the staged file on the same file system as ``destination``,
+        it can be renamed to ``destination`` atomically.
+    """
+    staged = destination + ".new"
+    try:
+        os.rename(source, staged)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        # Different file systems, do not leave partial copy behind.
+        try:
+            shutil.copyfile(source, staged)
+        except BaseException:
+            if os.path.exists(staged):
+                os.remove(staged)
+            raise
+        os.remove(source)
+    return staged
+
+
 def transfer_everything(source_butler: DirectButler, dest_butler: DirectButler) -> None:
     """Transfer all content from one butler to another butler.
 
@@ -182,21 +314,28 @@ def transfer_everything(source_butler: DirectButler, dest_butler: DirectButler)
     dest_butler : `~lsst.daf.butler.direct_butler.DirectButler`
         Butler to receive all the content.
     """
-    # Read all the datasets we are going to transfer, removing duplicates.
-    # This set could be extremely large.  For now assume this is a small
-    # to medium-sized registry.
-    source_refs = set(source_butler.registry.queryDatasets(..., collections=...))
-
     # Import the data to the new butler
     transfer_non_datasets(source_butler, dest_butler)
 
-    # If this is int to UUID we force "raw" to generate reproductible UUID.
-    # If other raw-type datasets are to be supported the command will have
-    # to take an additional parameter.
-    dest_refs = dest_butler.transfer_from(source_butler, source_refs, skip_missing=False)
-
     # Map source ID to destination ID.
-    source_to_dest = {source.id: dest for source, dest in zip(source_refs, dest_refs)}
+    source_to_dest: dict[DatasetId, DatasetRef] = {}
+
+    # Transfer datasets in chunks to limit memory use, the same dataset can
+    # be returned more than once by the query (e.g. if it is also in a
+    # TAGGED collection) so we skip datasets that were already transferred.
+    source_refs_iter = source_butler.registry.queryDatasets(..., collections=...)
+    for refs_chunk in chunk_iterable(source_refs_iter, chunk_size=50_000):
+        chunk_refs = {ref.id: ref for ref in refs_chunk if ref.id not in source_to_dest}
+        if not chunk_refs:
+            continue
+        source_refs = list(chunk_refs.values())
+
+        # If this is int to UUID we force "raw" to generate reproductible
+        # UUID. If other raw-type datasets are to be supported the command
+        # will have to take an additional parameter.
+        dest_refs = dest_butler.transfer_from(source_butler, source_refs, skip_missing=False)
+
+        source_to_dest.update((source.id, dest) for source, dest in zip(source_refs, dest_refs))
 
     # Create any dataset associations
     create_associations(source_butler, dest_butler, source_to_dest)
@@ -220,42 +359,46 @@ def create_associations(
     # For every dataset type in destination, get TAGGED and CALIBRATION
     # collection associations from the source, converting the source ID
     # to the correct destination ID.
-    associations_by_collection = defaultdict(list)
+    # Query only returns TAGGED and CALIBRATION collections, and only the
+    # latter have timespans, so we can tell their types without querying.
+    # Calibration refs are grouped by timespan to certify them together.
+    tagged_refs: defaultdict[str, list[DatasetRef]] = defaultdict(list)
+    certified_refs: defaultdict[tuple[str, Timespan], list[DatasetRef]] = defaultdict(list)
+
+    # Many repositories have no TAGGED or CALIBRATION collections at all, find
+    # them once so that dataset types are only queried when they can have
+    # associations.
+    tagged_collections = list(source_butler.registry.queryCollections(collectionTypes=CollectionType.TAGGED))
+    calibration_collections = list(
+        source_butler.registry.queryCollections(collectionTypes=CollectionType.CALIBRATION)
+    )
+    if not tagged_collections and not calibration_collections:
+        return
+
     for datasetType in dest_butler.registry.queryDatasetTypes(...):
-        collectionTypes = {CollectionType.TAGGED}
+        collections = list(tagged_collections)
         if datasetType.isCalibration():
-            collectionTypes.add(CollectionType.CALIBRATION)
+            collections += calibration_collections
+        if not collections:
+            continue
         type_associations = source_butler.registry.queryDatasetAssociations(
             datasetType,
-            collections=...,
-            collectionTypes=collectionTypes,
+            collections=collections,
             flattenChains=False,
         )
         for association in type_associations:
-            dest_association = DatasetAssociation(
-                ref=source_to_dest[association.ref.id],
-                collection=association.collection,
-                timespan=association.timespan,
-            )
-            associations_by_collection[association.collection].append(dest_association)
-
-    # Update associations in the destination.
-    for collection, associations in associations_by_collection.items():
-        collection_type = dest_butler.registry.getCollectionType(collection)
-        if collection_type == CollectionType.TAGGED:
-            dest_butler.registry.associate(collection, [assoc.ref for assoc in associations])
-        elif collection_type == CollectionType.CALIBRATION:
-            refsByTimespan = defaultdict(list)
-            for association in associations:
-                refsByTimespan[association.timespan].append(association.ref)
-            for timespan, refs in refsByTimespan.items():
-                assert timespan is not None
-                dest_butler.registry.certify(collection, refs, timespan)
-        else:
-            raise RuntimeError(
-                f"Unexpected collection association for collection {collection}"
-                f" of type {collection_type}."
-            )
+            dest_ref = source_to_dest[association.ref.id]
+            if association.timespan is None:
+                tagged_refs[association.collection].append(dest_ref)
+            else:
+                certified_refs[association.collection, association.timespan].append(dest_ref)
+
+    # Update associations in the destination, in a single transaction.
+    with dest_butler.registry.transaction():
+        for collection, refs in tagged_refs.items():
+            dest_butler.registry.associate(collection, refs)
+        for (collection, timespan), refs in certified_refs.items():
+            dest_butler.registry.certify(collection, refs, timespan)
 
 
 def transfer_non_datasets(source_butler: DirectButler, dest_butler: DirectButler) -> None:
@@ -268,35 +411,37 @@ def transfer_non_datasets(source_butler: DirectButler, dest_butler: DirectButler
     dest_butler : `~lsst.daf.butler.direct_butler.DirectButler`
         Destination butler.
     """
-    # Use a string buffer to save on file I/O.  This might result in twice
-    # the memory usage of using a file.
-    yamlBuffer = io.StringIO()
-
-    # Yaml is hard coded, since the class controls both ends of the
-    # export/import.
-    BackendClass = get_class_of(source_butler._config["repo_transfer_formats", "yaml", "export"])
-    backend = BackendClass(yamlBuffer)
-    exporter = RepoExportContext(source_butler, backend, directory=None, transfer=None)
-
-    # Export all the collections.
-    for c in source_butler.registry.queryCollections(..., flattenChains=True, includeChains=True):
-        exporter.saveCollection(c)
-
-    # Export all the dimensions.
-    for dimension in source_butler.dimensions.getStaticElements():
-        # Skip dimensions that are entirely derivable from other
-        # dimensions or are sky pixelization.
+    # Export to a temporary file rather than to a memory buffer, the export
+    # can be large and the import side parses all of it into memory anyway.
+    scratch_dir = os.environ.get(_SCRATCH_DIR_ENV) or None
+    with tempfile.TemporaryFile(mode="w+", suffix=".yaml", dir=scratch_dir) as yamlBuffer:
+        # Yaml is hard coded, since the class controls both ends of the
+        # export/import.
+        BackendClass = get_class_of(source_butler._config["repo_transfer_formats", "yaml", "export"])
+        backend = BackendClass(yamlBuffer)
+        exporter = RepoExportContext(source_butler, backend, directory=None, transfer=None)
+
+        # Export all the collections.
+        for c in source_butler.registry.queryCollections(..., flattenChains=True, includeChains=True):
+            exporter.saveCollection(c)
+
+        # Export all the dimensions. Skip dimensions that are entirely
+        # derivable from other dimensions or are sky pixelization.
         # eg "band" is always knowable from a "physical_filter".
-        if isinstance(dimension, SkyPixDimension) or dimension.viewOf is not None:
-            continue
-        records = source_butler.registry.queryDimensionRecords(dimension)
-        exporter.saveDimensionData(dimension, records)
-
-    exporter._finish()
-
-    # reset the string buffer to the beginning so the read operation will
-    # actually *see* the data that was exported.
-    yamlBuffer.seek(0)
-
-    # Import the buffer.
-    dest_butler.import_(filename=yamlBuffer, format="yaml")
+        dimensions = [
+            dimension
+            for dimension in source_butler.dimensions.getStaticElements()
+            if not isinstance(dimension, SkyPixDimension) and dimension.viewOf is None
+        ]
+        for dimension in dimensions:
+            records = source_butler.registry.queryDimensionRecords(dimension)
+            exporter.saveDimensionData(dimension, records)
+
+        exporter._finish()
+
+        # Rewind the file to the beginning so the read operation will
+        # actually *see* the data that was exported.
+        yamlBuffer.seek(0)
+
+        # Import the file.
+        dest_butler.import_(filename=yamlBuffer, format="yaml")
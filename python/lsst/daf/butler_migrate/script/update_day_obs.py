@@ -24,36 +24,18 @@ from __future__ import annotations
 __all__ = ["update_day_obs"]
 
 import logging
-from typing import Any
+from collections import defaultdict
 
-from lsst.daf.butler import Butler, DimensionRecord
+import sqlalchemy
+from lsst.daf.butler import Butler, ddl
+from lsst.daf.butler.direct_butler import DirectButler
+from lsst.daf.butler.registry.sql_registry import SqlRegistry
 from lsst.utils import doImportType
 from lsst.utils.iteration import chunk_iterable
 
 _LOG = logging.getLogger(__name__)
 
 
-def updated_record(rec: DimensionRecord, **kwargs: Any) -> DimensionRecord:
-    """Create a new record with modified fields.
-
-    Parameters
-    ----------
-    rec : `lsst.daf.butler.DimensionRecord`
-        Record to be cloned.
-    **kwargs : `typing.Any`
-        Values to modify on copy. The keys must be known to the record.
-
-    Returns
-    -------
-    new : `lsst.daf.butler.DimensionRecord`
-       New record with updated values.
-    """
-    d = rec.toDict()
-    # Should validate but this is not a general function for now.
-    d.update(kwargs)
-    return type(rec)(**d)
-
-
 def update_day_obs(repo: str, instrument: str) -> None:
     """Update the day_obs for the given instrument.
 
@@ -91,83 +73,119 @@ def update_day_obs(repo: str, instrument: str) -> None:
             " Unable to calculate the correct observing day."
         )
 
+    # Only one column changes, so tables are accessed directly instead of
+    # replacing whole records with insertDimensionData, which also
+    # re-inserts skypix overlaps for every visit.
+    assert isinstance(butler, DirectButler), "Expecting DirectButler instance"
+    assert isinstance(butler._registry, SqlRegistry), "Expecting SqlRegistry instance"
+    db = butler._registry._db
+    metadata = sqlalchemy.schema.MetaData(schema=db.namespace)
+    # Reflection does not know about daf_butler column types (e.g. the
+    # timespan range type on PostgreSQL), so timespan columns are declared
+    # explicitly to override reflected ones.
+    TimespanReprClass = db.getTimespanRepresentation()
+    timespan_columns = [
+        sqlalchemy.schema.Column(spec.name, spec.getSizedColumnType())
+        for spec in TimespanReprClass.makeFieldSpecs(nullable=True)
+    ]
+    exposure_table = sqlalchemy.schema.Table(
+        "exposure", metadata, *timespan_columns, autoload_with=db._engine
+    )
+    visit_table = sqlalchemy.schema.Table("visit", metadata, autoload_with=db._engine)
+    visit_definition_table = sqlalchemy.schema.Table("visit_definition", metadata, autoload_with=db._engine)
+
     # The naive approach is to query all the records and recalculate the
     # day_obs and then update them all in one big transaction. This will
     # be fine for a small repo but catastrophic with millions of exposure
-    # and visit records.
-    exposures_to_be_updated = {}
-    exposures = butler.registry.queryDimensionRecords("exposure", instrument=instrument)
+    # and visit records. Only the columns needed to recalculate day_obs are
+    # read, and only the new day_obs is kept for each exposure. Rows are
+    # fetched in chunks from a server-side cursor.
+    timespan_repr = TimespanReprClass.from_columns(exposure_table.columns)
+    sql = (
+        sqlalchemy.sql.select(exposure_table.c.id, exposure_table.c.day_obs, *timespan_repr.flatten())
+        .where(exposure_table.c.instrument == instrument)
+        .execution_options(stream_results=True, yield_per=10_000)
+    )
+    exposures_to_be_updated: dict[int, int] = {}
     counter = 0
-    for exp in exposures:
-        offset = translator.observing_date_to_offset(exp.timespan.begin)
-        day_obs = translator.observing_date_to_observing_day(exp.timespan.begin, offset)
-        if day_obs != exp.day_obs:
-            # Need to update the record. Immutable so need a copy.
-            exposures_to_be_updated[exp.id] = updated_record(exp, day_obs=day_obs)
-        counter += 1
+    with db.query(sql) as result:
+        for row in result.mappings():
+            counter += 1
+            timespan = TimespanReprClass.extract(row)
+            if timespan is None:
+                # Nothing to calculate day_obs from.
+                continue
+            begin = timespan.begin
+            offset = translator.observing_date_to_offset(begin)
+            day_obs = translator.observing_date_to_observing_day(begin, offset)
+            if day_obs != row["day_obs"]:
+                exposures_to_be_updated[row["id"]] = day_obs
 
     _LOG.info(
         "Number of exposure records needing to be updated: %d / %d", len(exposures_to_be_updated), counter
     )
 
-    visits_to_be_updated = {}
-
     # Work out the visits that need to be updated given the exposures we have
-    # updated. Chunk the queries.
-    for exposure_ids in chunk_iterable(exposures_to_be_updated, chunk_size=1_000):
-
-        # If there are modified exposures associated visits will have to be
-        # located and updated.
-        visit_defs = butler.registry.queryDimensionRecords(
-            "visit_definition",
-            where="exposure in (exps)",
-            bind={"exps": list(exposure_ids)},
-            instrument=instrument,
+    # updated, joining visit definitions with a temporary table of exposure
+    # IDs in one query. A visit has the same day_obs as all its exposures,
+    # but one exposure can belong to several visits.
+    exposure_visits: defaultdict[int, list[int]] = defaultdict(list)
+    if exposures_to_be_updated:
+        exposure_ids_spec = ddl.TableSpec(
+            fields=[ddl.FieldSpec("exposure", dtype=sqlalchemy.BigInteger, primaryKey=True)]
         )
-
-        visit_to_exposure = {}
-        for defn in visit_defs:
-            # We do not need to store all the exposures along with the visit
-            # since by definition a visit has the same day_obs across all
-            # exposures.
-            visit_to_exposure[defn.visit] = defn.exposure
-
-        # Now retrieve that visits themselves.
-        visits = butler.registry.queryDimensionRecords(
-            "visit",
-            where="visit in (visits)",
-            bind={"visits": list(visit_to_exposure)},
-            instrument=instrument,
-        )
-
-        for visit in visits:
-            exposure_id = visit_to_exposure[visit.id]
-            # Index by exposure ID for later batching of inserts.
-            visits_to_be_updated[exposure_id] = updated_record(
-                visit, day_obs=exposures_to_be_updated[exposure_id].day_obs
+        with db.temporary_table(exposure_ids_spec) as exposure_ids_table:
+            db.insert(
+                exposure_ids_table, *({"exposure": exposure_id} for exposure_id in exposures_to_be_updated)
             )
+            sql = (
+                sqlalchemy.sql.select(visit_definition_table.c.exposure, visit_definition_table.c.visit)
+                .join(
+                    exposure_ids_table,
+                    visit_definition_table.c.exposure == exposure_ids_table.c.exposure,
+                )
+                .where(visit_definition_table.c.instrument == instrument)
+            )
+            with db.query(sql) as result:
+                for exposure_id, visit_id in result:
+                    exposure_visits[exposure_id].append(visit_id)
+
+    _LOG.info(
+        "Number of visit records needing to be updated: %d",
+        len({visit_id for visit_ids in exposure_visits.values() for visit_id in visit_ids}),
+    )
 
-    _LOG.info("Number of visit records needing to be updated: %d", len(visits_to_be_updated))
+    # Bind parameter names cannot be the same as column names in UPDATE.
+    where = {"instrument": "instrument_name", "id": "record_id"}
 
-    # Batch inserts in smallish transactions so that on restart we will
+    # Batch updates in smallish transactions so that on restart we will
     # be able to ignore records that have already been fixed. It is important
     # that visits are updated when the exposures are updated.
     counter = 0
-    for exposure_ids in chunk_iterable(exposures_to_be_updated, chunk_size=1_000):
+    updated_visits: set[int] = set()
+    for exposure_ids in chunk_iterable(exposures_to_be_updated, chunk_size=10_000):
         with butler.transaction():
             counter += 1
             _LOG.info("Updating exposure/visit records (chunk %d)", counter)
-            exposure_records = [exposures_to_be_updated[exposure_id] for exposure_id in exposure_ids]
-            butler.registry.insertDimensionData("exposure", *exposure_records, replace=True)
-
-            visit_records = [
-                visits_to_be_updated[exposure_id]
+            exposure_rows = [
+                {
+                    "instrument_name": instrument,
+                    "record_id": exposure_id,
+                    "day_obs": exposures_to_be_updated[exposure_id],
+                }
                 for exposure_id in exposure_ids
-                if exposure_id in visits_to_be_updated
             ]
-            # insertDimensionData results in skypix overlaps being recalculated
-            # and re-inserted even though we are only changing one unrelated
-            # item.
-            butler.registry.insertDimensionData("visit", *visit_records, replace=True)
-
-    return
+            db.update(exposure_table, where, *exposure_rows)
+
+            # Visits with several exposures only need to be updated once.
+            visit_day_obs: dict[int, int] = {}
+            for exposure_id in exposure_ids:
+                for visit_id in exposure_visits.get(exposure_id, ()):
+                    if visit_id not in updated_visits:
+                        visit_day_obs[visit_id] = exposures_to_be_updated[exposure_id]
+            visit_rows = [
+                {"instrument_name": instrument, "record_id": visit_id, "day_obs": day_obs}
+                for visit_id, day_obs in visit_day_obs.items()
+            ]
+            db.update(visit_table, where, *visit_rows)
+            updated_visits.update(visit_day_obs)
@@ -21,10 +21,20 @@
 
 from __future__ import annotations
 
+import functools
+
 import sqlalchemy
 from lsst.daf.butler.registry.nameShrinker import NameShrinker
 
 
+@functools.lru_cache(maxsize=4)
+def _name_shrinker(max_length: int) -> NameShrinker:
+    """Return shared shrinker for a given maximum identifier length, shrinker
+    remembers names that it already shrank.
+    """
+    return NameShrinker(max_length)
+
+
 def shrinkDatabaseEntityName(original: str, connection: sqlalchemy.engine.Connection) -> str:
     """Shrink database entity name to a maximum allowed length.
 
@@ -49,7 +59,6 @@ def shrinkDatabaseEntityName(original: str, connection: sqlalchemy.engine.Connec
     """
     dialect = connection.dialect
     if dialect.name == "postgresql":
-        shrinker = NameShrinker(dialect.max_identifier_length)
-        return shrinker.shrink(original)
+        return _name_shrinker(dialect.max_identifier_length).shrink(original)
 
     return original
@@ -129,6 +129,15 @@ class DatabaseTestCase(unittest.TestCase):
                 ],
             )
 
+    def test_close(self) -> None:
+        """Test for close() method and context manager protocol"""
+        with make_revision_tables() as db_url:
+            with database.Database(db_url) as db:
+                self.assertEqual(len(db.alembic_revisions()), 2)
+            # Closed instance opens new connections when needed.
+            self.assertEqual(len(db.alembic_revisions()), 2)
+            db.close()
+
     def test_validate_revisions(self) -> None:
         """Test for validate_revisions() method"""
         with make_revision_tables() as db_url:
@@ -170,6 +179,15 @@ class DatabaseTestCase(unittest.TestCase):
             ):
                 db.validate_revisions()
 
+        # Revisions provided by caller are used instead of alembic table.
+        with make_revision_tables() as db_url:
+            db = database.Database(db_url)
+            db.validate_revisions(alembic_revisions=db.alembic_revisions())
+            with self.assertRaisesRegex(
+                database.RevisionConsistencyError, "Butler and alembic revisions are inconsistent"
+            ):
+                db.validate_revisions(alembic_revisions=["nonsense1"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -20,10 +20,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import contextlib
+import copy
+import functools
 import gc
+import itertools
 import os
+import shutil
 import tempfile
 import unittest
+from collections.abc import Iterator
 from typing import TYPE_CHECKING, Any
 
 import sqlalchemy
@@ -63,12 +68,19 @@ def _revision_id(version: int, namespace: str = "daf_butler") -> str:
     return rev_id(_MANAGER, namespace, str(version))
 
 
-def _make_universe(version: int) -> Config:
-    """Load dimensions universe for specific version."""
+@functools.cache
+def _load_universe(version: int) -> dict[str, Any]:
+    """Parse dimensions universe for specific version, parsed result is
+    shared and must not be modified.
+    """
     path = historical_dimensions_resource(version)
     with path.open() as input:
-        dimensions = yaml.safe_load(input)
-    return Config(dimensions)
+        return yaml.load(input, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def _make_universe(version: int) -> Config:
+    """Load dimensions universe for specific version."""
+    return Config(copy.deepcopy(_load_universe(version)))
 
 
 class DimensionsJsonTestCase(TestCaseMixin):
@@ -233,12 +245,10 @@ class DimensionsJsonTestCase(TestCaseMixin):
         butler.import_(filename=os.path.join(TESTDIR, "data", "records.yaml"), without_datastore=True)
 
         # Check records for v0 attributes.
-        records = list(butler.registry.queryDimensionRecords("visit"))
-        for record in records:
+        for record in butler.registry.queryDimensionRecords("visit"):
             self.assertEqual(record.visit_system, 0)
 
-        records = list(butler.registry.queryDimensionRecords("visit_definition"))
-        for record in records:
+        for record in butler.registry.queryDimensionRecords("visit_definition"):
             self.assertEqual(record.visit_system, 0)
 
         del butler
@@ -275,8 +285,7 @@ class DimensionsJsonTestCase(TestCaseMixin):
         butler = Butler(butler_root, writeable=False)  # type: ignore[abstract]
 
         # Check records for v2 attributes.
-        records = list(butler.registry.queryDimensionRecords("instrument"))
-        for record in records:
+        for record in butler.registry.queryDimensionRecords("instrument"):
             self.assertEqual(record.visit_system, 0)
 
         records = list(butler.registry.queryDimensionRecords("visit"))
@@ -285,15 +294,13 @@ class DimensionsJsonTestCase(TestCaseMixin):
             self.assertIsNone(record.azimuth)
         self.assertEqual({record.id: record.seq_num for record in records}, {1: 100, 2: 200})
 
-        records = list(butler.registry.queryDimensionRecords("exposure"))
-        for record in records:
+        for record in butler.registry.queryDimensionRecords("exposure"):
             self.assertFalse(record.has_simulated)
             self.assertIsNone(record.azimuth)
             self.assertEqual(record.seq_start, record.seq_num)
             self.assertEqual(record.seq_end, record.seq_num)
 
-        records = list(butler.registry.queryDimensionRecords("visit_definition"))
-        for record in records:
+        for record in butler.registry.queryDimensionRecords("visit_definition"):
             self.assertFalse(hasattr(record, "visit_system"))
 
         records = list(butler.registry.queryDimensionRecords("visit_system_membership"))
@@ -345,15 +352,45 @@ class DimensionsJsonTestCase(TestCaseMixin):
 class SQLiteDimensionsJsonTestCase(DimensionsJsonTestCase, unittest.TestCase):
     """Test using SQLite backend."""
 
+    template_root: str
+    template_repos: dict[int, str]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.template_root = makeTestTempDir(TESTDIR)
+        cls.template_repos = {}
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        removeTestTempDir(cls.template_root)
+        super().tearDownClass()
+
     def _butler_config(self) -> Config | None:
         return None
 
+    def make_butler(self, version: int, **kw: Any) -> str:
+        # Making and stamping a new repository is slow, SQLite repository is
+        # just a folder, so make one for each version and copy it.
+        template = self.template_repos.get(version)
+        if template is None:
+            butler_root = super().make_butler(version, **kw)
+            template = os.path.join(self.template_root, str(version))
+            shutil.copytree(butler_root, template)
+            self.template_repos[version] = template
+            return butler_root
+        butler_root = tempfile.mkdtemp(dir=self.root)
+        shutil.copytree(template, butler_root, dirs_exist_ok=True)
+        return butler_root
+
 
 @unittest.skipUnless(testing is not None, "testing.postgresql module not found")
 class PostgresDimensionsJsonTestCase(DimensionsJsonTestCase, unittest.TestCase):
     """Test using Postgres backend."""
 
     postgresql: Any
+    server: Any
+    namespace_counter: Iterator[int]
 
     @classmethod
     def _handler(cls, postgresql: Any) -> None:
@@ -363,10 +400,19 @@ class PostgresDimensionsJsonTestCase(DimensionsJsonTestCase, unittest.TestCase):
 
     @classmethod
     def setUpClass(cls) -> None:
-        # Create the postgres test server.
+        # Create the postgres test server. The server is discarded after the
+        # tests, so durability settings are relaxed (-F disables fsync).
         cls.postgresql = testing.postgresql.PostgresqlFactory(
-            cache_initialized_db=True, on_initialized=cls._handler
+            cache_initialized_db=True,
+            on_initialized=cls._handler,
+            postgres_args=(
+                "-h 127.0.0.1 -F -c logging_collector=off"
+                " -c synchronous_commit=off -c full_page_writes=off"
+            ),
         )
+        # One server for all tests, each butler gets its own namespace.
+        cls.server = cls.postgresql()
+        cls.namespace_counter = itertools.count(1)
         super().setUpClass()
 
     @classmethod
@@ -374,20 +420,16 @@ class PostgresDimensionsJsonTestCase(DimensionsJsonTestCase, unittest.TestCase):
         # Clean up any lingering SQLAlchemy engines/connections
         # so they're closed before we shut down the server.
         gc.collect()
+        cls.server.stop()
         cls.postgresql.clear_cache()
         super().tearDownClass()
 
-    def setUp(self) -> None:
-        super().setUp()
-        self.server = self.postgresql()
-        self.count = 0
-
     def _butler_config(self) -> Config | None:
-        # Use unique namespace for each instance, some tests may use sub-tests.
-        self.count += 1
+        # Use unique namespace for each instance, tests share the server and
+        # some tests may use sub-tests.
         reg_config = {
             "db": self.server.url(),
-            "namespace": f"namespace{self.count}",
+            "namespace": f"namespace{next(self.namespace_counter)}",
         }
         return Config({"registry": reg_config})
 
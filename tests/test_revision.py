@@ -34,6 +34,19 @@ class RevisionTestCase(unittest.TestCase):
         rev_id = revision.rev_id(*args)
         self.assertEqual(rev_id, "41f090400d3f")
 
+    def test_rev_id_known_revisions(self) -> None:
+        """Test rev_id against revisions of existing migration scripts"""
+        vectors = (
+            (("datasets",), "059cc7b7ef13"),
+            (("datasets", "ByDimensionsDatasetRecordStorageManagerUUID", "1.0.0"), "2101fbf51ad3"),
+            (("dimensions-config",), "3e2891b82110"),
+            (("dimensions-config", "daf_butler", "0"), "f3bcee34f344"),
+            (("dimensions-config", "daf_butler", "1"), "380002bcbb26"),
+        )
+        for args, expected in vectors:
+            with self.subTest(args=args):
+                self.assertEqual(revision.rev_id(*args), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,245 @@
+# This file is part of daf_butler_migrate.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import gc
+import itertools
+import os
+import unittest
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any
+
+import astropy.time
+import sqlalchemy
+from lsst.daf.butler import Butler, Config, Timespan
+from lsst.daf.butler.tests.utils import makeTestTempDir, removeTestTempDir
+from lsst.daf.butler_migrate import script
+from lsst.utils.introspection import get_full_type_name
+
+try:
+    import testing.postgresql  # type: ignore[import-untyped]
+except ImportError:
+    testing = None
+
+if TYPE_CHECKING:
+
+    class TestCaseMixin(unittest.TestCase):
+        """Base class for mixin test classes that use TestCase methods."""
+
+else:
+
+    class TestCaseMixin:
+        """Do-nothing definition of mixin base class for regular execution."""
+
+
+TESTDIR = os.path.abspath(os.path.dirname(__file__))
+
+_INSTRUMENT = "Cam"
+
+
+class StubTranslator:
+    """Translator with observing day equal to the UTC date."""
+
+    @staticmethod
+    def observing_date_to_offset(observing_date: astropy.time.Time) -> None:
+        return None
+
+    @staticmethod
+    def observing_date_to_observing_day(observing_date: astropy.time.Time, offset: None) -> int:
+        return int(observing_date.strftime("%Y%m%d"))
+
+
+class StubInstrument:
+    """Instrument class providing a translator for update_day_obs."""
+
+    translatorClass = StubTranslator
+
+
+def _timespan(date: str) -> Timespan:
+    begin = astropy.time.Time(f"{date}T12:00:00", scale="tai")
+    return Timespan(begin, begin + astropy.time.TimeDelta(30, format="sec"))
+
+
+class UpdateDayObsTestCase(TestCaseMixin):
+    """Tests for update_day_obs script."""
+
+    def setUp(self) -> None:
+        self.root = makeTestTempDir(TESTDIR)
+
+    def tearDown(self) -> None:
+        removeTestTempDir(self.root)
+
+    def _butler_config(self) -> Config | None:
+        """Make configuration for creating new Butlers."""
+        raise NotImplementedError()
+
+    def make_butler(self) -> str:
+        """Make a repository with exposures and visits that have wrong
+        day_obs values.
+        """
+        Butler.makeRepo(self.root, config=self._butler_config())
+        butler = Butler.from_config(self.root, writeable=True)
+        registry = butler.registry
+        registry.insertDimensionData(
+            "instrument",
+            {
+                "name": _INSTRUMENT,
+                "class_name": get_full_type_name(StubInstrument),
+                "visit_max": 1000,
+                "exposure_max": 1000,
+                "detector_max": 10,
+            },
+        )
+        registry.insertDimensionData(
+            "day_obs", *({"instrument": _INSTRUMENT, "id": day} for day in (20240101, 20240102, 20240103))
+        )
+        registry.insertDimensionData("group", {"instrument": _INSTRUMENT, "name": "group"})
+        registry.insertDimensionData(
+            "physical_filter", {"instrument": _INSTRUMENT, "name": "filter", "band": "band"}
+        )
+        registry.insertDimensionData(
+            "visit_system",
+            {"instrument": _INSTRUMENT, "id": 0, "name": "one-to-one"},
+            {"instrument": _INSTRUMENT, "id": 1, "name": "by-seq-num"},
+        )
+        # All records are stored with day_obs=20240101, exposure 4 is the only
+        # one for which that is correct.
+        exposure_dates = {1: "2024-01-02", 2: "2024-01-02", 3: "2024-01-03", 4: "2024-01-01"}
+        registry.insertDimensionData(
+            "exposure",
+            *(
+                {
+                    "instrument": _INSTRUMENT,
+                    "id": exposure_id,
+                    "obs_id": f"exp{exposure_id}",
+                    "physical_filter": "filter",
+                    "group": "group",
+                    "day_obs": 20240101,
+                    "timespan": _timespan(date),
+                }
+                for exposure_id, date in exposure_dates.items()
+            ),
+        )
+        # Exposures 1 and 3 belong to two visits each, visit 101 has exposures
+        # 1 and 2.
+        visit_exposures = {1: [1], 101: [1, 2], 3: [3], 201: [3], 4: [4]}
+        registry.insertDimensionData(
+            "visit",
+            *(
+                {
+                    "instrument": _INSTRUMENT,
+                    "id": visit_id,
+                    "name": f"visit{visit_id}",
+                    "physical_filter": "filter",
+                    "day_obs": 20240101,
+                    "timespan": _timespan(exposure_dates[exposure_ids[0]]),
+                }
+                for visit_id, exposure_ids in visit_exposures.items()
+            ),
+        )
+        registry.insertDimensionData(
+            "visit_definition",
+            *(
+                {"instrument": _INSTRUMENT, "exposure": exposure_id, "visit": visit_id}
+                for visit_id, exposure_ids in visit_exposures.items()
+                for exposure_id in exposure_ids
+            ),
+        )
+        del registry, butler
+        # Clean up SQLAlchemy engines before the script opens its own.
+        gc.collect()
+        return self.root
+
+    def _day_obs(self, butler_root: str, element: str) -> dict[int, int]:
+        """Return day_obs for each record of a dimension element."""
+        butler = Butler.from_config(butler_root)
+        records = butler.registry.queryDimensionRecords(element, instrument=_INSTRUMENT)
+        return {record.id: record.day_obs for record in records}
+
+    def test_update_day_obs(self) -> None:
+        """Test that exposure and visit day_obs values are fixed."""
+        butler_root = self.make_butler()
+
+        script.update_day_obs(butler_root, _INSTRUMENT)
+
+        expected_exposures = {1: 20240102, 2: 20240102, 3: 20240103, 4: 20240101}
+        expected_visits = {1: 20240102, 101: 20240102, 3: 20240103, 201: 20240103, 4: 20240101}
+        self.assertEqual(self._day_obs(butler_root, "exposure"), expected_exposures)
+        self.assertEqual(self._day_obs(butler_root, "visit"), expected_visits)
+
+        # Running again has nothing to update.
+        script.update_day_obs(butler_root, _INSTRUMENT)
+        self.assertEqual(self._day_obs(butler_root, "exposure"), expected_exposures)
+        self.assertEqual(self._day_obs(butler_root, "visit"), expected_visits)
+
+
+class SQLiteUpdateDayObsTestCase(UpdateDayObsTestCase, unittest.TestCase):
+    """Test using SQLite backend."""
+
+    def _butler_config(self) -> Config | None:
+        return None
+
+
+@unittest.skipUnless(testing is not None, "testing.postgresql module not found")
+class PostgresUpdateDayObsTestCase(UpdateDayObsTestCase, unittest.TestCase):
+    """Test using Postgres backend."""
+
+    postgresql: Any
+    server: Any
+    namespace_counter: Iterator[int]
+
+    @classmethod
+    def _handler(cls, postgresql: Any) -> None:
+        engine = sqlalchemy.engine.create_engine(postgresql.url())
+        with engine.begin() as connection:
+            connection.execute(sqlalchemy.text("CREATE EXTENSION btree_gist;"))
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Create the postgres test server.
+        cls.postgresql = testing.postgresql.PostgresqlFactory(
+            cache_initialized_db=True, on_initialized=cls._handler
+        )
+        # One server for all tests, each butler gets its own namespace.
+        cls.server = cls.postgresql()
+        cls.namespace_counter = itertools.count(1)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        # Clean up any lingering SQLAlchemy engines/connections
+        # so they're closed before we shut down the server.
+        gc.collect()
+        cls.server.stop()
+        cls.postgresql.clear_cache()
+        super().tearDownClass()
+
+    def _butler_config(self) -> Config | None:
+        reg_config = {
+            "db": self.server.url(),
+            "namespace": f"namespace{next(self.namespace_counter)}",
+        }
+        return Config({"registry": reg_config})
+
+
+if __name__ == "__main__":
+    unittest.main()